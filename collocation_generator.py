@@ -18,13 +18,21 @@ Anki 搭配卡片生成器 (Oxford Collocation Dictionary)
 
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree
 from pathlib import Path
 import time
 import re
 import argparse
 import sys
 import logging
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
 
 # ================== 配置区 ==================
 
@@ -40,8 +48,15 @@ EASE_THRESHOLD = 2000
 LAPSES_THRESHOLD = 2
 MAX_WORDS = 100
 
-# 绕过系统代理，直接连接 localhost
-NO_PROXY = {"http": None, "https": None}
+# MDX-Server 并发查询数
+QUERY_WORKERS = 16
+
+# 多进程解析时每批提交的单词数
+PARSE_BATCH = 64
+
+# 解析进程不用 fork 启动：查询线程运行时 fork 不安全，而旧版 Python 会在运行中按需启动子进程
+_PARSE_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
 
 # 要保留的搭配类别（sl 属性值）
 KEEP_SL_TYPES = {
@@ -51,6 +66,15 @@ KEEP_SL_TYPES = {
     'prep',         # PREPOSITION
 }
 
+# ================== 预编译正则 ==================
+
+_RE_NONALPHA = re.compile(r'[^a-zA-Z\s-]')
+_RE_WS = re.compile(r'\s+')
+# Anki 字段清理：HTML 标签、[sound:...] 及非字母字符，一次替换完成
+_RE_CLEAN = re.compile(r'<[^>]+>|sound\S*|[^a-zA-Z\s-]', re.IGNORECASE)
+# 词典的 <head> 与 HTML 的 <head> 同名，lxml 会将其丢弃，解析前先改名
+_RE_HEAD_TAG = re.compile(r'<(/?)head(?=[\s/>])')
+
 # ================== 日志 ==================
 
 logging.basicConfig(
@@ -67,13 +91,12 @@ def load_freq_dict(dict_file):
     """加载词频字典，返回 {word_form: rank} 映射（所有词形都映射到同一行号）"""
     freq_map = {}
     try:
-        with open(dict_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, start=1):
-                words = line.strip().split()
-                for word in words:
-                    word = word.lower()
-                    if word not in freq_map:
-                        freq_map[word] = line_num
+        # mmap 按行读取字节，每行只解码一次
+        with open(dict_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line_num, line in enumerate(iter(mm.readline, b''), start=1):
+                for word in line.decode('utf-8').lower().split():
+                    # 先出现的（高频）行号优先
+                    freq_map.setdefault(word, line_num)
         print(f"✅ 加载词频字典: {len(freq_map)} 个词形, {line_num} 行")
     except FileNotFoundError:
         print(f"⚠️  未找到词频字典文件: {dict_file}")
@@ -86,8 +109,8 @@ def get_words_from_list(word_list):
     results = []
     for word in word_list:
         word = word.strip().lower()
-        word = re.sub(r'[^a-zA-Z\s-]', '', word)
-        word = re.sub(r'\s+', ' ', word).strip()
+        word = _RE_NONALPHA.sub('', word)
+        word = _RE_WS.sub(' ', word).strip()
         if word and len(word) > 1:
             results.append({'word': word})
     return results
@@ -129,19 +152,22 @@ def get_difficult_words():
     LIMIT {MAX_WORDS}
     """
 
-    results = []
-    for row in conn.execute(query):
-        word = row[0].strip() if row[0] else ""
-        word = re.sub(r'<[^>]+>', '', word)
-        word = re.sub(r'sound[^\s]*', '', word, flags=re.IGNORECASE)
-        word = re.sub(r'[^a-zA-Z\s-]', '', word)
-        word = re.sub(r'\s+', ' ', word).strip()
-        word = word.split()[0] if word.split() else ""
-        if word and len(word) > 1 and word.isalpha():
-            results.append({'word': word.lower()})
-
+    rows = conn.execute(query).fetchall()
     conn.close()
-    return results
+
+    # 清理字段后取第一个单词
+    cleaned = (_RE_CLEAN.sub('', row[0] or '').split() for row in rows)
+    return [{'word': words[0].lower()} for words in cleaned
+            if words and len(words[0]) > 1 and words[0].isalpha()]
+
+
+def _is_plain_english(k):
+    """是否为纯英文单词（ASCII 字母，连字符只能出现在字母之间）"""
+    # 用字符串方法代替正则
+    if not k.isascii():
+        return False
+    return (k.replace('-', '').isalpha() and '--' not in k
+            and not k.startswith('-') and not k.endswith('-'))
 
 
 def get_all_dictionary_words(mdx_dir=None):
@@ -173,13 +199,7 @@ def get_all_dictionary_words(mdx_dir=None):
         return []
 
     # 只保留纯英文单词（含连字符），过滤掉短语、反查索引、中文等
-    english_words = set()
-    for k in keys:
-        k = k.strip()
-        if k and re.match(r'^[a-zA-Z]+(-[a-zA-Z]+)*$', k):
-            english_words.add(k.lower())
-
-    words_sorted = sorted(english_words)
+    words_sorted = sorted({k.lower() for k in map(str.strip, keys) if _is_plain_english(k)})
     print(f"  📊 词典共有 {len(words_sorted)} 个英文词头")
     return [{'word': w} for w in words_sorted]
 
@@ -208,24 +228,16 @@ def _get_mdx_builder(mdx_dir=None):
         return None
 
 
-def query_mdx_direct(word, mdx_dir=None):
-    """直接查询 MDX 文件（无需 MDX-Server，速度更快）"""
-    builder = _get_mdx_builder(mdx_dir)
-    if builder is None:
-        return None
-    try:
-        content = builder.mdx_lookup(word)
-        if content:
-            return ''.join(content)
-    except Exception:
-        pass
-    return None
+# MDX-Server 会话：复用连接（keep-alive），连接池大小与并发查询数一致
+_session = requests.Session()
+_session.trust_env = False  # 绕过系统代理，直接连接 localhost
+_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=QUERY_WORKERS))
 
 
 def check_mdx_server():
     """检测 MDX-Server 是否运行"""
     try:
-        response = requests.get(f"{MDX_SERVER_URL}/test", timeout=15, proxies=NO_PROXY)
+        response = _session.get(f"{MDX_SERVER_URL}/test", timeout=15)
         return response.status_code == 200
     except requests.exceptions.ConnectionError:
         return False
@@ -238,21 +250,85 @@ def check_mdx_server():
 
 
 def query_mdx_server(word):
-    """通过 MDX-Server 查询单词"""
+    """通过 MDX-Server 查询单词，超时返回 False，其他失败返回 None"""
     try:
         url = f"{MDX_SERVER_URL}/{word}"
-        response = requests.get(url, timeout=30, proxies=NO_PROXY)
+        response = _session.get(url, timeout=30)
         response.encoding = 'utf-8'
         if response.status_code == 200:
             return response.text
     except requests.exceptions.Timeout:
-        print(f"(超时)", end=" ")
+        return False  # 在工作线程中不打印，由主循环输出到对应单词的进度行
     except Exception:
         pass
     return None
 
+
+def _bounded_map(executor, fn, iterable, window):
+    """
+    类似 executor.map，按顺序返回结果，但最多只有 window 个任务在排队或执行
+    （executor.map 会先提交全部任务，结果全部堆积在内存中）
+    """
+    pending = deque()
+    for arg in iterable:
+        pending.append(executor.submit(fn, arg))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def query_words(words, builder=None):
+    """
+    按顺序逐个返回单词的查询结果（HTML；失败为 None，超时为 False）
+    传入 builder 时直接查询 MDX 文件（无需 MDX-Server，速度更快），否则并发查询 MDX-Server
+    """
+    if builder is not None:
+        mdx_lookup = builder.mdx_lookup
+        for word in words:
+            try:
+                content = mdx_lookup(word)
+            except Exception:
+                content = None
+            yield ''.join(content) if content else None
+        return
+
+    with ThreadPoolExecutor(max_workers=QUERY_WORKERS) as executor:
+        yield from _bounded_map(executor, query_mdx_server, words, QUERY_WORKERS * 4)
+
 # ================== 步骤3: 解析牛津搭配词典 HTML ==================
 
+# 快速预筛：不含要保留的搭配类别时无需解析
+_KEEP_SL_ATTRS = tuple(f'sl="{t}"' for t in KEEP_SL_TYPES)
+
+# 预编译 XPath（模块加载时编译一次）
+# HTML 以 UTF-8 字节传给解析器：带 <?xml encoding=...?> 声明的 str 会被 lxml 拒绝
+_HTML_PARSER = etree.HTMLParser(encoding='utf-8')
+
+_XP_ENTRY = etree.XPath('//entry')
+_XP_CHN = etree.XPath('.//chn')
+_XP_SL_G_BLK = etree.XPath('.//sl-g-blk[@sl]')
+_XP_SL_G_HEAD = etree.XPath('.//sl-g-head')
+_XP_SB_G = etree.XPath('.//sb-g')
+# 英文文本：跳过中文及标记节点下的文本
+_XP_TEXT_EN = etree.XPath(
+    './/text()[not(ancestor::chn or ancestor::chnsep)]', smart_strings=False)
+_XP_TEXT_EX_EN = etree.XPath(
+    './/text()[not(ancestor::chn or ancestor::chnsep or ancestor::fthzmark)]', smart_strings=False)
+
+
+def _first(xpath, elem):
+    """返回 XPath 的第一个匹配节点，没有则返回 None"""
+    found = xpath(elem)
+    return found[0] if found else None
+
+
+def _text(elem, xpath=None):
+    """提取节点文本（等同于 BeautifulSoup 的 get_text(strip=True)），xpath 用于筛选文本节点"""
+    strings = elem.itertext() if xpath is None else xpath(elem)
+    return ''.join(s.strip() for s in strings)
+
+
 def parse_collocation_html(html_content, word):
     """
     解析牛津搭配词典 HTML，按义项拆分为多张卡片
@@ -279,64 +355,72 @@ def parse_collocation_html(html_content, word):
     """
     if not html_content:
         return []
+    if '<entry' not in html_content:
+        return []
+    if not any(attr in html_content for attr in _KEEP_SL_ATTRS):
+        return []
 
-    soup = BeautifulSoup(html_content, 'html.parser')
-    entries = soup.find_all('entry')
+    html_content = _RE_HEAD_TAG.sub(r'<\1entry-head', html_content)
+    try:
+        root = etree.HTML(html_content.encode('utf-8'), _HTML_PARSER)
+    except (ValueError, etree.ParserError):
+        return []
+    if root is None:
+        return []
 
+    entries = _XP_ENTRY(root)
     if not entries:
         return []
 
     cards = []
 
     for entry in entries:
+        # 单个节点用 C 层迭代器按文档顺序取第一个匹配（比 XPath 开销小）
+        entry_iter = entry.iterdescendants
+
         # 提取词头
-        h_elem = entry.find('h')
-        headword = h_elem.get_text(strip=True) if h_elem else word
+        h_elem = next(entry_iter('h'), None)
+        headword = _text(h_elem) if h_elem is not None else word
 
         # 提取词性
-        head = entry.find('head')
+        head = next(entry_iter('entry-head'), None)
         pos = ""
         sense_num = ""
         def_en = ""
         def_cn = ""
 
-        if head:
-            p_elem = head.find('p')
-            pos = p_elem.get_text(strip=True) if p_elem else ""
+        if head is not None:
+            head_iter = head.iterdescendants
+            p_elem = next(head_iter('p'), None)
+            pos = _text(p_elem) if p_elem is not None else ""
 
-            n_num_elem = head.find('n-num')
-            sense_num = n_num_elem.get_text(strip=True) if n_num_elem else ""
+            n_num_elem = next(head_iter('n-num'), None)
+            sense_num = _text(n_num_elem) if n_num_elem is not None else ""
 
-            def_elem = head.find('def')
-            if def_elem:
-                chn_elem = def_elem.find('chn')
-                def_cn = chn_elem.get_text(strip=True) if chn_elem else ""
+            def_elem = next(head_iter('def'), None)
+            if def_elem is not None:
+                chn_elem = next(def_elem.iterdescendants('chn'), None)
+                def_cn = _text(chn_elem) if chn_elem is not None else ""
                 # 英文释义：去掉中文部分
-                for chn in def_elem.find_all('chn'):
-                    chn.decompose()
-                for chnsep in def_elem.find_all('chnsep'):
-                    chnsep.decompose()
-                def_en = def_elem.get_text(strip=True)
+                def_en = _text(def_elem, _XP_TEXT_EN)
 
         # 提取搭配（只保留动词和介词）
         collocation_groups = []
-        sl_g_blks = entry.find_all('sl-g-blk')
 
-        for blk in sl_g_blks:
+        for blk in _XP_SL_G_BLK(entry):
             sl_type = blk.get('sl', '')
             if sl_type not in KEEP_SL_TYPES:
                 continue
 
             # 类别标题（规范化空格）
-            head_elem = blk.find('sl-g-head')
-            category_title = head_elem.get_text() if head_elem else sl_type.upper()
-            category_title = re.sub(r'\s+', ' ', category_title).strip()
+            head_elem = _first(_XP_SL_G_HEAD, blk)
+            category_title = ''.join(head_elem.itertext()) if head_elem is not None else sl_type.upper()
+            category_title = _RE_WS.sub(' ', category_title).strip()
 
             # 提取搭配词组和例句
             collocation_items = []
-            sb_gs = blk.find_all('sb-g')
 
-            for sb_g in sb_gs:
+            for sb_g in _XP_SB_G(blk):
                 item = _parse_sb_g(sb_g)
                 if item:
                     collocation_items.append(item)
@@ -369,17 +453,13 @@ def _parse_sb_g(sb_g):
     collocations = []
     chn_text = ""
 
-    for cl in sb_g.find_all('cl', recursive=False):
-        # 复制节点以避免修改原始 soup
-        cl_copy = cl.__copy__()
+    for cl in sb_g.iterchildren('cl'):
         # 提取中文
-        chn = cl.find('chn')
-        if chn:
-            chn_text = chn.get_text(strip=True)
+        chn = _first(_XP_CHN, cl)
+        if chn is not None:
+            chn_text = _text(chn)
         # 提取英文搭配词（去掉 chn 和 chnsep）
-        for tag in cl.find_all(['chn', 'chnsep']):
-            tag.decompose()
-        cl_text = cl.get_text(strip=True)
+        cl_text = _text(cl, _XP_TEXT_EN)
         if cl_text:
             collocations.append(cl_text)
 
@@ -388,17 +468,16 @@ def _parse_sb_g(sb_g):
 
     # 提取例句
     examples = []
-    for x_blk in sb_g.find_all('x-blk', recursive=False):
-        x_elem = x_blk.find('x')
-        if x_elem:
-            x_chn = x_elem.find('chn')
-            ex_cn = x_chn.get_text(strip=True) if x_chn else ""
-            # 去掉中文获取英文例句
-            for tag in x_elem.find_all(['chn', 'chnsep', 'fthzmark']):
-                tag.decompose()
-            ex_en = x_elem.get_text(strip=True)
-            if ex_en:
-                examples.append({'en': ex_en, 'cn': ex_cn})
+    for x_blk in sb_g.iterchildren('x-blk'):
+        x_elem = next(x_blk.iterdescendants('x'), None)
+        if x_elem is None:
+            continue
+        x_chn = _first(_XP_CHN, x_elem)
+        ex_cn = _text(x_chn) if x_chn is not None else ""
+        # 去掉中文获取英文例句
+        ex_en = _text(x_elem, _XP_TEXT_EX_EN)
+        if ex_en:
+            examples.append({'en': ex_en, 'cn': ex_cn})
 
     return {
         'words': collocations,
@@ -406,44 +485,84 @@ def _parse_sb_g(sb_g):
         'examples': examples,
     }
 
+
+def _parse_worker(html, word):
+    """解析子进程入口：查询失败时原样返回 None/False（超时），以便与「无搭配」（空列表）区分"""
+    if not html:
+        return html
+    return parse_collocation_html(html, word)
+
+
+def _parse_batch(batch):
+    """解析子进程入口：批量解析 [(html, word), ...]，减少进程间通信次数"""
+    return [_parse_worker(html, word) for html, word in batch]
+
+
+def _parse_in_pool(executor, htmls, words):
+    """用进程池按顺序解析查询结果，分批提交并限制在途批数，边查询边解析"""
+    pairs = zip(htmls, words)
+    batches = iter(lambda: list(islice(pairs, PARSE_BATCH)), [])
+    window = (os.cpu_count() or 1) * 4
+    return chain.from_iterable(_bounded_map(executor, _parse_batch, batches, window))
+
 # ================== 步骤4: 生成 Anki 卡片字段 ==================
 
+# 搭配 HTML 的固定片段（只需拼接动态内容）
+_GROUP_OPEN = '<div class="colloc-group"><div class="colloc-category">'
+_ITEM_OPEN = '<div class="colloc-item"><div class="colloc-words"><span class="colloc-word">'
+_WORD_SEP = '</span> <span class="sep">|</span> <span class="colloc-word">'
+_CHN_OPEN = '<span class="colloc-chn">'
+_EX_OPEN = '<div class="colloc-example"><div class="ex-en">✦ '
+_EX_CN_OPEN = '<div class="ex-cn">'
+_SPAN_CLOSE = '</span>'
+_DIV_CLOSE = '</div>'
+
+
 def generate_collocations_html(card):
     """生成搭配内容 HTML（包含中英文，由模板 CSS 控制显隐）"""
-    groups_html = ""
+    parts = []
+    append = parts.append
     for group in card['collocation_groups']:
-        groups_html += f'<div class="colloc-group">'
-        groups_html += f'<div class="colloc-category">{group["category"]}</div>'
+        append(_GROUP_OPEN)
+        append(group['category'])
+        append(_DIV_CLOSE)
 
         for item in group['items']:
-            groups_html += '<div class="colloc-item">'
-            words_str = ' <span class="sep">|</span> '.join(
-                f'<span class="colloc-word">{w}</span>' for w in item['words']
-            )
+            append(_ITEM_OPEN)
+            append(_WORD_SEP.join(item['words']))
+            append(_SPAN_CLOSE)
             if item['chn']:
-                words_str += f'<span class="colloc-chn">{item["chn"]}</span>'
-            groups_html += f'<div class="colloc-words">{words_str}</div>'
+                append(_CHN_OPEN)
+                append(item['chn'])
+                append(_SPAN_CLOSE)
+            append(_DIV_CLOSE)  # colloc-words
 
             for ex in item['examples']:
-                groups_html += '<div class="colloc-example">'
-                groups_html += f'<div class="ex-en">✦ {ex["en"]}</div>'
+                append(_EX_OPEN)
+                append(ex['en'])
+                append(_DIV_CLOSE)
                 if ex['cn']:
-                    groups_html += f'<div class="ex-cn">{ex["cn"]}</div>'
-                groups_html += '</div>'
+                    append(_EX_CN_OPEN)
+                    append(ex['cn'])
+                    append(_DIV_CLOSE)
+                append(_DIV_CLOSE)  # colloc-example
+
+            append(_DIV_CLOSE)  # colloc-item
+        append(_DIV_CLOSE)  # colloc-group
+
+    return ''.join(parts)
 
-            groups_html += '</div>'
-        groups_html += '</div>'
 
-    return groups_html
+# 搭配 HTML 中需去掉的字符（换行和 Tab 会破坏 TSV 格式）
+_TSV_STRIP = str.maketrans('', '', '\n\r\t')
 
 
 def generate_anki_import_file(all_cards):
-    """生成 Anki 导入文件 (TSV)
+    """逐行生成 Anki 导入文件 (TSV) 内容
     格式: Word<tab>POS<tab>SenseNum<tab>DefEN<tab>DefCN<tab>Collocations<tab>FreqRank<tab>Tags
     """
-    lines = []
     for card in all_cards:
-        colloc = generate_collocations_html(card).replace('\n', '').replace('\r', '')
+        colloc = generate_collocations_html(card).translate(_TSV_STRIP)
         freq_rank = str(card.get('freq_rank', ''))
         fields = [
             card['word'],
@@ -455,8 +574,7 @@ def generate_anki_import_file(all_cards):
             freq_rank,
             card['word'],  # tag
         ]
-        lines.append('\t'.join(fields))
-    return '\n'.join(lines)
+        yield '\t'.join(fields) + '\n'
 
 # ================== CSS 样式 ==================
 
@@ -705,6 +823,7 @@ def main():
     # 检查查询方式
     use_direct = args.all  # --all 模式自动使用直接查询
     mdx_dir = args.mdx_dir
+    builder = None
 
     if use_direct:
         print("🔍 初始化直接词典查询...")
@@ -756,14 +875,8 @@ def main():
         print(f"⚠️  单词数量超过限制，将只处理前 {args.max} 个")
         word_list = word_list[:args.max]
 
-    # 去重
-    seen = set()
-    unique_words = []
-    for w in word_list:
-        if w['word'] not in seen:
-            seen.add(w['word'])
-            unique_words.append(w)
-    word_list = unique_words
+    # 去重（保持原有顺序）
+    word_list = list({w['word']: w for w in word_list}.values())
 
     print(f"✅ 找到 {len(word_list)} 个单词\n")
 
@@ -776,41 +889,43 @@ def main():
     # 大批量时减少输出
     verbose = total <= 50
 
-    for i, item in enumerate(word_list, 1):
-        word = item['word']
+    # 所有单词来源都已转为小写，可直接查词频
+    words = [item['word'] for item in word_list]
+    freq_get = freq_map.get
 
-        if verbose:
-            print(f"[{i}/{total}] {word:20}", end=" ", flush=True)
-        elif i % 200 == 0 or i == total:
-            print(f"  进度: {i}/{total} ({i*100//total}%)  卡片: {len(all_cards)}  成功: {success_count}", flush=True)
-
-        # 查询
-        if use_direct:
-            html = query_mdx_direct(word, mdx_dir)
+    # 大批量时用多进程解析 HTML（CPU 密集），少量单词直接在主进程解析
+    with (nullcontext() if verbose else ProcessPoolExecutor(mp_context=_PARSE_MP_CONTEXT)) as executor:
+        if executor is None:
+            results = map(_parse_worker, query_words(words, builder), words)
         else:
-            html = query_mdx_server(word)
-
-        if html:
-            cards = parse_collocation_html(html, word)
-            if cards:
-                # 附加词频序号
-                rank = freq_map.get(word.lower(), '')
-                for card in cards:
-                    card['freq_rank'] = str(rank)
-                all_cards.extend(cards)
-                success_count += 1
-                if verbose:
-                    print(f"→ {len(cards)} 张卡片 ✓")
+            results = _parse_in_pool(executor, query_words(words, builder), words)
+
+        for i, (word, cards) in enumerate(zip(words, results), 1):
+            if verbose:
+                print(f"[{i}/{total}] {word:20}", end=" ", flush=True)
+            elif i % 200 == 0 or i == total:
+                print(f"  进度: {i}/{total} ({i*100//total}%)  卡片: {len(all_cards)}  成功: {success_count}", flush=True)
+
+            if isinstance(cards, list):
+                if cards:
+                    # 附加词频序号
+                    rank = freq_get(word, '')
+                    for card in cards:
+                        card['freq_rank'] = str(rank)
+                    all_cards.extend(cards)
+                    success_count += 1
+                    if verbose:
+                        print(f"→ {len(cards)} 张卡片 ✓")
+                else:
+                    if verbose:
+                        print("→ 无动词/介词搭配 ✗")
+                    logger.info(f"SKIP {word}: 无动词/介词搭配")
+                    failed_words.append(word)
             else:
                 if verbose:
-                    print("→ 无动词/介词搭配 ✗")
-                logger.info(f"SKIP {word}: 无动词/介词搭配")
+                    print("(超时) → 查询失败 ✗" if cards is False else "→ 查询失败 ✗")
+                logger.info(f"SKIP {word}: 查询失败")
                 failed_words.append(word)
-        else:
-            if verbose:
-                print("→ 查询失败 ✗")
-            logger.info(f"SKIP {word}: 查询失败")
-            failed_words.append(word)
 
     print()
 
@@ -820,10 +935,8 @@ def main():
 
     # 生成导入文件
     print("📝 生成 Anki 导入文件...")
-    import_content = generate_anki_import_file(all_cards)
-
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(import_content)
+    with open(OUTPUT_FILE, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(generate_anki_import_file(all_cards))
 
     # 保存样式
     css_file = "anki_card_style.css"
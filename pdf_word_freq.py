@@ -5,14 +5,50 @@ PDF 单词频次统计脚本
 支持单个或批量 PDF 文件处理，提取单词并统计频次
 """
 
+import io
+import json
+import multiprocessing
+import os
+import pickle
 import re
 import csv
+import shutil
+import subprocess
+import sys
 import argparse
 from pathlib import Path
 from collections import Counter
-from typing import Dict, List, Set
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import pypdf
 
+try:
+    import pymupdf  # 可选：C 实现的文本提取，比 pypdf 快得多
+except ImportError:
+    try:
+        import fitz as pymupdf  # 旧版 PyMuPDF 只提供 fitz 模块名
+    except ImportError:
+        pymupdf = None
+
+# 可选：poppler 的 pdftotext 命令行工具，未安装 PyMuPDF 时比 pypdf 快得多
+_PDFTOTEXT = shutil.which('pdftotext')
+
+# 当前可用的文本提取方式（按优先级），不同方式提取出的文本不同，需写入缓存键
+_EXTRACTORS = [name for name, available in (('pymupdf', pymupdf is not None),
+                                            ('pdftotext', _PDFTOTEXT is not None),
+                                            ('pypdf', True)) if available]
+
+# 单词匹配：字母和连字符组成的单词，至少两个字母（跳过单字母单词，'a' 和 'i' 本就是停用词）
+_WORD_RE = re.compile(r'\b[A-Za-z](?:[A-Za-z]|-[A-Za-z])[A-Za-z]*(?:-[A-Za-z]+)*\b')
+
+# 单个 PDF 统计结果的缓存文件后缀；统计规则变化时递增版本号使旧缓存失效
+_PDF_CACHE_SUFFIX = '.wfcache.json'
+_PDF_CACHE_VERSION = 3
+
+# Linux 上用 fork 启动子进程，子进程直接继承主进程已加载的词典（写时复制共享内存）
+_MP_CONTEXT = multiprocessing.get_context('fork') if sys.platform.startswith('linux') else None
+
 
 class WordFrequencyAnalyzer:
     def __init__(self, dict_file: str = "eng_dict.txt"):
@@ -22,21 +58,71 @@ class WordFrequencyAnalyzer:
         Args:
             dict_file: 词形词典文件路径
         """
-        self.lemma_dict, self.line_numbers = self._load_lemma_dict(dict_file)
+        self.dict_file = dict_file
         self.stopwords = self._get_stopwords()
+        self.lemma_dict, self.line_numbers = self._load_lemma_dict(dict_file)
     
     def _load_lemma_dict(self, dict_file: str):
         """
         加载词形还原字典
         每行第一个单词是基础形式，后续是变体
+        解析结果缓存到 <dict_file>.pkl，词典文件未修改时直接读取缓存
         
         Returns:
             (lemma_dict, line_numbers): 词形映射字典和行号字典
-            lemma_dict: {变体: 基础形式}
+            lemma_dict: {变体: 基础形式}，停用词映射为 None
             line_numbers: {基础形式: 行号}
         """
         lemma_dict = {}
         line_numbers = {}
+        cache_file = Path(dict_file + '.pkl')
+        try:
+            stat = Path(dict_file).stat()
+            cache_key = (stat.st_mtime_ns, stat.st_size)
+            lemma_dict, line_numbers = self._load_lemma_cache(cache_file, cache_key)
+        except FileNotFoundError:
+            pass
+        
+        if lemma_dict:
+            print(f"✓ 加载词形字典: {len(lemma_dict)} 个词形")
+        else:
+            lemma_dict, line_numbers = self._parse_lemma_dict(dict_file, cache_file)
+        
+        # 停用词及还原后为停用词的变体映射为 None，统计时只需一次查询
+        stopwords = self.stopwords
+        for word, base_form in lemma_dict.items():
+            if base_form in stopwords:
+                lemma_dict[word] = None
+        for word in stopwords:
+            lemma_dict.setdefault(word, None)
+        
+        return lemma_dict, line_numbers
+    
+    def _load_lemma_cache(self, cache_file: Path, cache_key: Tuple[int, int]):
+        """
+        读取词形字典缓存
+        
+        Returns:
+            (lemma_dict, line_numbers)，缓存不存在、已损坏或已过期时返回空字典
+        """
+        try:
+            with open(cache_file, 'rb') as f:
+                key, lemma_dict, line_numbers = pickle.load(f)
+            if key == cache_key:
+                return lemma_dict, line_numbers
+        except Exception:
+            pass
+        return {}, {}
+    
+    def _parse_lemma_dict(self, dict_file: str, cache_file: Path):
+        """
+        解析词形字典文本文件，并写入缓存
+        
+        Returns:
+            (lemma_dict, line_numbers)
+        """
+        lemma_dict = {}
+        line_numbers = {}
         try:
             with open(dict_file, 'r', encoding='utf-8') as f:
                 for line_num, line in enumerate(f, start=1):
@@ -60,6 +146,16 @@ class WordFrequencyAnalyzer:
             print(f"✓ 加载词形字典: {len(lemma_dict)} 个词形")
         except FileNotFoundError:
             print(f"⚠ 未找到词形字典文件 {dict_file}，将不进行词形还原")
+            return lemma_dict, line_numbers
+        
+        # 缓存键：词典文件的修改时间和大小
+        stat = Path(dict_file).stat()
+        try:
+            with open(cache_file, 'wb') as f:
+                pickle.dump(((stat.st_mtime_ns, stat.st_size), lemma_dict, line_numbers),
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # 无法写缓存（如目录只读）不影响使用
         
         return lemma_dict, line_numbers
     
@@ -86,31 +182,76 @@ class WordFrequencyAnalyzer:
         }
         return stopwords
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
+    def iter_page_texts(self, pdf_path: str) -> Iterator[str]:
         """
-        从 PDF 文件中提取文本
+        逐页提取 PDF 文本，不在内存中拼接整篇文档
+        优先使用 PyMuPDF，其次 pdftotext，都不可用或无法处理该文件时使用 pypdf
         
         Args:
             pdf_path: PDF 文件路径
             
-        Returns:
-            提取的文本内容
+        Yields:
+            每一页的文本内容
+            
+        Raises:
+            读取失败时抛出异常，调用方据此判断提取是否完整
         """
-        text = ""
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = pypdf.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-                
+        if pymupdf is not None:
+            try:
+                doc = pymupdf.open(pdf_path)
+            except Exception:
+                doc = None  # PyMuPDF 无法处理的文件交给 pypdf
+            if doc is not None:
+                with doc:
+                    for page in doc:
+                        yield page.get_text("text")
+                    print(f"  ✓ 提取 {doc.page_count} 页内容")
+                return
+        
+        if _PDFTOTEXT is not None:
+            num_pages = 0
+            try:
+                for text in self._iter_pdftotext_pages(pdf_path):
+                    num_pages += 1
+                    yield text
                 print(f"  ✓ 提取 {num_pages} 页内容")
-        except Exception as e:
-            print(f"  ✗ 读取失败: {e}")
+                return
+            except Exception:
+                if num_pages:
+                    raise
+                # 一页都没有输出时交给 pypdf
         
-        return text
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = pypdf.PdfReader(file)
+            num_pages = len(pdf_reader.pages)
+            
+            for page in pdf_reader.pages:
+                yield page.extract_text()
+            
+            print(f"  ✓ 提取 {num_pages} 页内容")
+    
+    def _iter_pdftotext_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        调用 pdftotext 逐页读取文本（页与页之间以换页符 \\f 分隔）
+        
+        Raises:
+            subprocess.CalledProcessError: pdftotext 返回非零退出码
+        """
+        cmd = [_PDFTOTEXT, '-raw', '-enc', 'UTF-8', pdf_path, '-']
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+            page = []
+            for line in io.TextIOWrapper(proc.stdout, encoding='utf-8', errors='ignore'):
+                if '\f' in line:
+                    *ends, line = line.split('\f')
+                    for end in ends:
+                        page.append(end)
+                        yield ''.join(page)
+                        page = []
+                page.append(line)
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
+            if any(page):
+                yield ''.join(page)
     
     def process_text(self, text: str) -> Counter:
         """
@@ -122,33 +263,18 @@ class WordFrequencyAnalyzer:
         Returns:
             单词频次计数器
         """
-        # 转为小写
-        text = text.lower()
-        
+        return Counter(self._iter_lemmas(text))
+    
+    def _iter_lemmas(self, text: str) -> Iterator[str]:
+        """分词、过滤、词形还原，返回基础形式的迭代器"""
         # 提取单词（包括连字符的单词）
-        # 匹配字母和连字符组成的单词
-        words = re.findall(r'\b[a-z]+(?:-[a-z]+)*\b', text)
-        
-        # 过滤和统计
-        word_counter = Counter()
+        # 只对匹配到的单词转小写，不复制整篇文本；单字母单词已由正则跳过
+        words = list(map(str.lower, _WORD_RE.findall(text)))
         
-        for word in words:
-            # 跳过单字母单词（除了 'a' 和 'i'，但它们在停用词中）
-            if len(word) < 2:
-                continue
-            
-            # 跳过包含数字的词（已在正则中排除）
-            
-            # 词形还原
-            lemma = self.lemma_dict.get(word, word)
-            
-            # 跳过停用词
-            if lemma in self.stopwords:
-                continue
-            
-            word_counter[lemma] += 1
-        
-        return word_counter
+        # 词形还原（停用词还原为 None 并被过滤），交给 Counter 在 C 层计数
+        lemma_get = self.lemma_dict.get
+        lemmas = map(lemma_get, words, words)
+        return filter(None, lemmas)
     
     def analyze_pdfs(self, pdf_paths: List[str]) -> Counter:
         """
@@ -162,32 +288,129 @@ class WordFrequencyAnalyzer:
         """
         total_counter = Counter()
         
+        # 先读取缓存，只处理缓存未命中的文件
+        cached = {}
+        cache_keys = {pdf_path: self._pdf_cache_key(pdf_path) for pdf_path in pdf_paths}
+        for pdf_path in pdf_paths:
+            word_counter = self._load_pdf_cache(pdf_path, cache_keys[pdf_path])
+            if word_counter is not None:
+                cached[pdf_path] = word_counter
+        todo = [pdf_path for pdf_path in pdf_paths if pdf_path not in cached]
+        
+        pooled = {}
+        if len(todo) > 1:
+            # 多个文件时每个 PDF 交给一个子进程（提取和分词都是 CPU 密集）
+            max_workers = min(len(todo), os.cpu_count() or 1)
+            global _worker_analyzer
+            _worker_analyzer = self  # fork 出的子进程直接复用，无需重新加载词典
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=_MP_CONTEXT,
+                                     initializer=_init_worker,
+                                     initargs=(self.dict_file,)) as executor:
+                pooled = dict(zip(todo, executor.map(_process_one, todo)))
+        
+        # 按文件顺序输出并合并；子进程的输出已缓存，主进程中处理的文件实时输出
         for pdf_path in pdf_paths:
             print(f"\n处理: {Path(pdf_path).name}")
-            text = self.extract_text_from_pdf(pdf_path)
-            word_counter = self.process_text(text)
+            if pdf_path in cached:
+                word_counter = cached[pdf_path]
+                print("  ✓ 使用缓存结果")
+            else:
+                if pdf_path in pooled:
+                    output, word_counter, complete = pooled[pdf_path]
+                    print(output, end='')
+                else:
+                    word_counter, complete = self._process_pdf(pdf_path)
+                if complete:  # 提取中途失败的部分结果不缓存
+                    self._save_pdf_cache(pdf_path, cache_keys[pdf_path], word_counter)
             total_counter.update(word_counter)
             print(f"  ✓ 提取 {sum(word_counter.values())} 个有效单词")
         
         return total_counter
     
-    def save_to_csv(self, word_counter: Counter, output_file: str):
+    def _process_pdf(self, pdf_path: str) -> Tuple[Counter, bool]:
+        """
+        处理单个 PDF 文件，逐页统计，内存中只保留当前页
+        
+        Returns:
+            (word_counter, complete): 单词频次计数器、是否完整提取
+            （读取失败时计数器只包含失败前的页面）
+        """
+        word_counter = Counter()
+        try:
+            for text in self.iter_page_texts(pdf_path):
+                word_counter.update(self._iter_lemmas(text))
+        except Exception as e:
+            print(f"  ✗ 读取失败: {e}")
+            return word_counter, False
+        return word_counter, True
+    
+    def _pdf_cache_key(self, pdf_path: str):
+        """
+        生成 PDF 统计结果的缓存键：PDF 与词形字典的修改时间和大小，以及可用的提取方式
+        
+        Returns:
+            缓存键列表，PDF 无法访问时返回 None
+        """
+        try:
+            pdf_stat = os.stat(pdf_path)
+        except OSError:
+            return None
+        try:
+            dict_stat = os.stat(self.dict_file)
+            dict_key = [dict_stat.st_mtime_ns, dict_stat.st_size]
+        except OSError:
+            dict_key = None
+        return [_PDF_CACHE_VERSION, pdf_stat.st_mtime_ns, pdf_stat.st_size, dict_key, _EXTRACTORS]
+    
+    def _load_pdf_cache(self, pdf_path: str, cache_key) -> Counter:
+        """
+        读取 <pdf>.wfcache.json 中的统计结果
+        
+        Returns:
+            单词频次计数器，缓存不存在、已损坏或已过期时返回 None
+        """
+        if cache_key is None:
+            return None
+        try:
+            with open(pdf_path + _PDF_CACHE_SUFFIX, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache['key'] == cache_key:
+                return Counter(cache['counts'])
+        except Exception:
+            pass
+        return None
+    
+    def _save_pdf_cache(self, pdf_path: str, cache_key, word_counter: Counter):
+        """将统计结果写入 <pdf>.wfcache.json（空结果不缓存）"""
+        if cache_key is None or not word_counter:
+            return
+        try:
+            with open(pdf_path + _PDF_CACHE_SUFFIX, 'w', encoding='utf-8') as f:
+                json.dump({'key': cache_key, 'counts': word_counter}, f, ensure_ascii=False)
+        except OSError:
+            pass  # 无法写缓存（如目录只读）不影响使用
+    
+    def save_to_csv(self, word_counter: Counter, output_file: str,
+                    ranked: Optional[List[Tuple[str, int]]] = None):
         """
         将统计结果保存到 CSV 文件
         
         Args:
             word_counter: 单词频次计数器
             output_file: 输出文件路径
+            ranked: 已按频次降序排好的 (单词, 频次) 列表，省略时由 word_counter 排序
         """
+        if ranked is None:
+            ranked = word_counter.most_common()
         try:
-            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            # 按频次降序写入，先构造好所有行再一次性写入
+            line_get = self.line_numbers.get
+            rows = [(word, freq, line_get(word, '')) for word, freq in ranked]
+            
+            with open(output_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 writer.writerow(['Word', 'Frequency', 'DictLineNumber'])
-                
-                # 按频次降序排序
-                for word, freq in word_counter.most_common():
-                    line_num = self.line_numbers.get(word, '')
-                    writer.writerow([word, freq, line_num])
+                writer.writerows(rows)
             
             print(f"\n✓ 结果已保存到: {output_file}")
             print(f"  - 总计: {len(word_counter)} 个不同单词")
@@ -196,6 +419,26 @@ class WordFrequencyAnalyzer:
             print(f"\n✗ 保存失败: {e}")
 
 
+# 子进程中的分析器（fork 时继承自主进程，否则由进程池 initializer 创建，每个进程只加载一次词典）
+_worker_analyzer = None
+
+
+def _init_worker(dict_file: str):
+    """进程池初始化：子进程没有继承到同一词典的分析器时加载词形字典"""
+    global _worker_analyzer
+    if _worker_analyzer is not None and _worker_analyzer.dict_file == dict_file:
+        return
+    with redirect_stdout(io.StringIO()):
+        _worker_analyzer = WordFrequencyAnalyzer(dict_file)
+
+
+def _process_one(pdf_path: str) -> Tuple[str, Counter, bool]:
+    """在子进程中处理单个 PDF，输出信息缓存后交给主进程按文件顺序打印"""
+    with redirect_stdout(io.StringIO()) as output:
+        word_counter, complete = _worker_analyzer._process_pdf(pdf_path)
+    return output.getvalue(), word_counter, complete
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='PDF 单词频次统计工具',
@@ -263,14 +506,17 @@ def main():
     analyzer = WordFrequencyAnalyzer(args.dict)
     word_counter = analyzer.analyze_pdfs(valid_pdfs)
     
+    # 排序一次，保存结果和显示高频词共用
+    ranked = word_counter.most_common()
+    
     # 保存结果
-    analyzer.save_to_csv(word_counter, output_file)
+    analyzer.save_to_csv(word_counter, output_file, ranked)
     
     # 显示前 10 个高频词
     print(f"\n{'='*60}")
     print("Top 10 高频词:")
     print(f"{'='*60}")
-    for word, freq in word_counter.most_common(10):
+    for word, freq in ranked[:10]:
         print(f"  {word:20s} {freq:6d}")
 
 